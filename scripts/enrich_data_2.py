@@ -1,69 +1,214 @@
+import argparse
+import asyncio
+import aiohttp
+import logging
+import orjson
 import pandas as pd
-import requests
-import time
+import random
 import os
-import json
+import sqlite3
+import time
 from urllib.parse import quote
 import xml.etree.ElementTree as ET
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+
+log = logging.getLogger("enrich")
+
+# Copy-on-write avoids defensive copies on the per-batch column merges.
+# It's always on from pandas 3.0; the option only exists on 2.x
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def setup_logging(log_file="enrich.log"):
+    """
+    Log everything to a file and only warnings to the terminal.
+
+    With dozens of tasks in flight, per-request chatter on stdout would
+    serialize on the stream lock; the full INFO detail goes to the log file
+    instead.
+    """
+    file_handler = logging.FileHandler(log_file)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setLevel(logging.WARNING)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(message)s",
+        handlers=[file_handler, stream_handler],
+    )
+
+# Per-host concurrency limits. Wikidata rate-limits aggressively, so only
+# one query may be in flight at a time; Semantic Scholar and PubMed tolerate
+# a handful of parallel requests.
+SS_CONCURRENCY = 8
+PM_CONCURRENCY = 8
+WD_CONCURRENCY = 1
+
+USER_AGENT = "Research Project - Taxon Analysis"
+
+# Keep idle connections open between batches so every request after the
+# first reuses the TCP+TLS connection instead of paying a fresh handshake
+# (~100 ms per request saved on each host). aiohttp has no HTTP/2, so the
+# shared connector is where reuse happens.
+KEEPALIVE_TIMEOUT = 30
+
+# Names per Wikidata VALUES query. Sized well below the WDQS 60 s query
+# timeout; one query resolves a whole group instead of one name each.
+WD_VALUES_BATCH = 50
+
+# API responses change at most daily, so cache them on disk for a week.
+# Reruns and overlapping taxon sets then resolve from local SQLite instead
+# of re-hitting the APIs.
+CACHE_EXPIRE_AFTER = 7 * 86400
+
+# Empty results are stickier than positive ones - a binomial that isn't in
+# PubMed today won't be next week either - so they get a longer TTL in a
+# separate negative cache.
+NEG_CACHE_TTL = 30 * 86400
+
+# Wikidata fetchers return this when the API answered and confirmed there
+# is no entity/year, as opposed to None when the request itself failed.
+# Only confirmed misses may enter the negative cache; failures stay NA so
+# the next run retries them.
+NO_RESULT = object()
+
+class NegativeCache:
+    """
+    Remembers (source, taxon) pairs that previously returned no results, so
+    incremental runs can skip queries that are known to come back empty.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS neg_cache (
+                source TEXT,
+                taxon TEXT,
+                last_checked INTEGER,
+                PRIMARY KEY (source, taxon)
+            )
+        """)
+        self.conn.commit()
+
+    def known_empty(self, source, taxon):
+        row = self.conn.execute(
+            "SELECT last_checked FROM neg_cache WHERE source = ? AND taxon = ?",
+            (source, taxon),
+        ).fetchone()
+        return row is not None and time.time() - row[0] < NEG_CACHE_TTL
+
+    def record_empty(self, source, taxa):
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO neg_cache VALUES (?, ?, ?)",
+            [(source, taxon, now) for taxon in taxa],
+        )
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM neg_cache")
+        self.conn.commit()
+
+async def fetch_json(session, url, params=None, headers=None, max_retries=6, base=0.5):
+    """
+    GET a URL and return the parsed JSON body, retrying transient failures
+    with exponential backoff.
+
+    429/503 responses honor the server's Retry-After header when present;
+    other retryable statuses and connection errors back off exponentially
+    with a little jitter so concurrent tasks don't retry in lockstep.
+    Returns None once the retries are exhausted.
+    """
+    for attempt in range(max_retries):
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status == 200:
+                    # orjson is several times faster than the stdlib json
+                    # that aiohttp's .json() defaults to
+                    return orjson.loads(await response.read())
+
+                if response.status in (429, 503):
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after is not None and retry_after.isdigit():
+                        delay = int(retry_after)
+                    else:
+                        delay = min(60, base * 2 ** attempt) + random.uniform(0, 0.25)
+                    log.warning("Got %s from %s, retrying in %.1fs", response.status, response.host, delay)
+                elif response.status >= 500:
+                    delay = min(60, base * 2 ** attempt) + random.uniform(0, 0.25)
+                    log.warning("Got %s from %s, retrying in %.1fs", response.status, response.host, delay)
+                else:
+                    # Client errors other than rate limiting won't get better
+                    log.warning("Got %s from %s, giving up", response.status, response.host)
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            delay = min(60, base * 2 ** attempt) + random.uniform(0, 0.25)
+            log.warning("Connection error for %s: %s, retrying in %.1fs", url, e, delay)
+
+        await asyncio.sleep(delay)
+
+    log.warning("Giving up on %s after %d attempts", url, max_retries)
+    return None
 
-def get_semantic_scholar_attention(taxon_name):
+async def get_semantic_scholar_attention(session, semaphore, taxon_name):
     """
-    Query Semantic Scholar API for the taxon name and return the number of results.
+    Query Semantic Scholar API for the taxon name and return the number of results,
+    or None if the request ultimately failed (so a real zero stays distinguishable).
     """
     try:
         # URL encode the taxon name
         encoded_taxon = quote(taxon_name)
         url = f"https://api.semanticscholar.org/graph/v1/paper/search?query={encoded_taxon}&limit=1&fields=total"
-        
-        headers = {
-            "User-Agent": "Research Project - Taxon Analysis"
-        }
-        
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Return the total number of results
-            return data.get('total', 0)
-        else:
-            print(f"Error with Semantic Scholar API for {taxon_name}: {response.status_code}")
-            return 0
+
+        async with semaphore:
+            data = await fetch_json(session, url)
+
+        if data is None:
+            log.warning("Error with Semantic Scholar API for %s", taxon_name)
+            return None
+        # Return the total number of results
+        return data.get('total', 0)
     except Exception as e:
-        print(f"Exception while querying Semantic Scholar for {taxon_name}: {e}")
-        return 0
+        log.warning("Exception while querying Semantic Scholar for %s: %s", taxon_name, e)
+        return None
 
-def get_pubmed_attention(taxon_name):
+async def get_pubmed_attention(session, semaphore, taxon_name):
     """
-    Query PubMed API for the taxon name and return the number of results.
+    Query PubMed API for the taxon name and return the number of results,
+    or None if the request ultimately failed (so a real zero stays distinguishable).
     """
     try:
         # URL encode the taxon name
         encoded_taxon = quote(taxon_name)
-        
+
         # Use NCBI's E-utilities API (esearch)
         url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={encoded_taxon}&retmode=json"
-        
-        headers = {
-            "User-Agent": "Research Project - Taxon Analysis"
-        }
-        
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Return the total number of results from PubMed
-            return int(data.get('esearchresult', {}).get('count', 0))
-        else:
-            print(f"Error with PubMed API for {taxon_name}: {response.status_code, response.text}")
-            return 0
+
+        async with semaphore:
+            data = await fetch_json(session, url)
+
+        if data is None:
+            log.warning("Error with PubMed API for %s", taxon_name)
+            return None
+        # Return the total number of results from PubMed
+        return int(data.get('esearchresult', {}).get('count', 0))
     except Exception as e:
-        print(f"Exception while querying PubMed for {taxon_name}: {e}")
-        return 0
+        log.warning("Exception while querying PubMed for %s: %s", taxon_name, e)
+        return None
+
+def parse_inception_year(date_value):
+    """
+    Extract the year from a Wikidata inception value (YYYY or YYYY-MM-DD...).
+    """
+    year = date_value.split('-')[0] if '-' in date_value else date_value
+    return int(year) if year.isdigit() else None
 
-def get_wikidata_year(taxon_name):
+async def get_wikidata_year(session, semaphore, taxon_name):
     """
     Query Wikidata for the taxon name and return the year of first description.
     Uses taxon-specific properties for better results.
+
+    Returns NO_RESULT when Wikidata answered but has no entity or year for
+    the name, and None when the request itself failed.
     """
     try:
         # Improve the SPARQL query to better identify taxonomic entities
@@ -82,153 +227,311 @@ def get_wikidata_year(taxon_name):
             ?item rdfs:label "{taxon_name}"@en.
             ?item wdt:P105 ?taxonRank. # has taxon rank
           }}
-          
+
           # Get the inception/description date if available
-          OPTIONAL {{ 
+          OPTIONAL {{
             ?item wdt:P571 ?inception. # inception/description date
           }}
-          
+
           SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
         }}
         LIMIT 1
         """
-        
+
         url = "https://query.wikidata.org/sparql"
-        headers = {
-            "User-Agent": "Research Project - Taxon Analysis",
-            "Accept": "application/json"
-        }
-        
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params={"query": query, "format": "json"}
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get('results', {}).get('bindings', [])
-            
-            if results:
-                # Debug output to see what's being returned
-                print(f"  Wikidata found: {len(results)} results")
-                
-                if 'inception' in results[0]:
-                    # Extract the year from the date value
-                    date_value = results[0]['inception']['value']
-                    # Date format could be YYYY or YYYY-MM-DD
-                    year = date_value.split('-')[0] if '-' in date_value else date_value
-                    return int(year) if year.isdigit() else None
-                else:
-                    print(f"  No inception date found for {taxon_name}")
-                    return None
+
+        async with semaphore:
+            data = await fetch_json(
+                session,
+                url,
+                headers={"Accept": "application/json"},
+                params={"query": query, "format": "json"}
+            )
+
+        if data is None:
+            log.warning("Error with Wikidata API for %s", taxon_name)
+            return None
+
+        results = data.get('results', {}).get('bindings', [])
+
+        if results:
+            # Debug output to see what's being returned
+            log.info("  Wikidata found: %d results", len(results))
+
+            if 'inception' in results[0]:
+                # Extract the year from the date value
+                year = parse_inception_year(results[0]['inception']['value'])
+                return year if year is not None else NO_RESULT
             else:
-                print(f"  No Wikidata entity found for {taxon_name}")
-                return None
+                log.info("  No inception date found for %s", taxon_name)
+                return NO_RESULT
         else:
-            print(f"Error with Wikidata API for {taxon_name}: {response.status_code}")
-            if response.status_code == 429:
-                print("  Rate limit exceeded, waiting 60 seconds")
-                time.sleep(60)  # Wait longer if rate limited
-            return None
+            log.info("  No Wikidata entity found for %s", taxon_name)
+            return NO_RESULT
     except Exception as e:
-        print(f"Exception while querying Wikidata for {taxon_name}: {e}")
+        log.warning("Exception while querying Wikidata for %s: %s", taxon_name, e)
         return None
 
-def enrich_taxon_data(input_file, output_file, batch_size=100):
+async def ss_batch(session, semaphore, names):
+    """
+    Fetch Semantic Scholar attention for a chunk of names, returning name -> count.
+
+    The graph search API has no per-term count batching, so the chunk is
+    coalesced into concurrent requests over the shared keep-alive session.
+    """
+    results = await asyncio.gather(*[
+        get_semantic_scholar_attention(session, semaphore, name) for name in names
+    ])
+    return dict(zip(names, results))
+
+async def pm_batch(session, semaphore, names):
+    """
+    Fetch PubMed attention for a chunk of names, returning name -> count.
+
+    ESearch only reports one count per term, so as with ss_batch the chunk
+    runs as concurrent requests on the shared session.
+    """
+    results = await asyncio.gather(*[
+        get_pubmed_attention(session, semaphore, name) for name in names
+    ])
+    return dict(zip(names, results))
+
+async def wd_batch(session, semaphore, names):
+    """
+    Fetch Wikidata first-description years for a chunk of names, returning name -> year.
+
+    Resolves up to WD_VALUES_BATCH names per SPARQL query with a VALUES
+    clause over the scientific-name property (P225). Names the batch query
+    can't match (e.g. common names only present as labels) fall back to the
+    per-name query with its broader UNION patterns. Values follow the
+    get_wikidata_year convention: year, NO_RESULT for a confirmed miss, or
+    None when the request failed.
+    """
+    years = {}
+    for start in range(0, len(names), WD_VALUES_BATCH):
+        group = list(names[start:start + WD_VALUES_BATCH])
+        # Quotes can't appear inside SPARQL string literals
+        values = " ".join('"{}"'.format(name.replace('"', '')) for name in group)
+        query = f"""
+        SELECT ?name ?inception WHERE {{
+          VALUES ?name {{ {values} }}
+          ?item wdt:P225 ?name.
+          OPTIONAL {{ ?item wdt:P571 ?inception. }}
+        }}
+        """
+
+        async with semaphore:
+            data = await fetch_json(
+                session,
+                "https://query.wikidata.org/sparql",
+                headers={"Accept": "application/json"},
+                params={"query": query, "format": "json"}
+            )
+
+        if data is None:
+            log.warning("Error with batched Wikidata query for %d names", len(group))
+            continue
+
+        # A name that answered at all is confirmed: it gets a year or
+        # NO_RESULT, never None
+        for binding in data.get('results', {}).get('bindings', []):
+            name = binding.get('name', {}).get('value')
+            if name is None or isinstance(years.get(name), int):
+                continue
+            if 'inception' in binding:
+                year = parse_inception_year(binding['inception']['value'])
+                years[name] = year if year is not None else NO_RESULT
+            else:
+                years.setdefault(name, NO_RESULT)
+
+    # Fall back to the per-name query for names P225 didn't resolve at all
+    missing = [name for name in names if name not in years]
+    if missing:
+        log.info("%d names missed the batched Wikidata query, retrying individually", len(missing))
+        fallback = await asyncio.gather(*[
+            get_wikidata_year(session, semaphore, name) for name in missing
+        ])
+        years.update(dict(zip(missing, fallback)))
+
+    return years
+
+async def enrich_taxon_data(input_file, output_file, batch_size=100, use_cache=True, refresh_negatives=False):
     """
     Process the taxon data file and add attention from multiple sources and year of first description.
-    
+
+    Rows are processed concurrently: each batch of batch_size rows is fired off
+    at once, and within a row the three API lookups run in parallel. Per-host
+    semaphores keep the request rate within each API's tolerance. Responses
+    are cached on disk so repeat runs don't re-query the APIs, and taxa that
+    previously came back empty are skipped via a negative cache.
+
     Args:
         input_file: Path to the input CSV with taxon data
         output_file: Path to save the enriched data
-        batch_size: Number of records to process before saving a checkpoint
+        batch_size: Number of records to process concurrently per batch
+        use_cache: Serve repeated requests from the on-disk HTTP cache
+        refresh_negatives: Drop the negative cache and re-query known-empty taxa
     """
     # Create output directory if it doesn't exist
     output_dir = os.path.dirname(output_file)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
+
     # Create checkpoint directory
     checkpoint_dir = os.path.join(output_dir, 'checkpoints')
     if not os.path.exists(checkpoint_dir):
         os.makedirs(checkpoint_dir)
-    
+
     # Load the taxon data
-    print(f"Loading taxon data from {input_file}")
-    taxon_data = pd.read_csv(input_file)
-    
-    # Initialize new columns
-    if 'attention_ss' not in taxon_data.columns:
-        taxon_data['attention_ss'] = None
-    if 'attention_pm' not in taxon_data.columns:
-        taxon_data['attention_pm'] = None
-    if 'year_ofd' not in taxon_data.columns:
-        taxon_data['year_ofd'] = None
-    
-    # Check for existing checkpoint
-    latest_checkpoint = None
-    checkpoint_files = [f for f in os.listdir(checkpoint_dir) if f.startswith('checkpoint_') and f.endswith('.csv')]
-    if checkpoint_files:
-        latest_checkpoint = os.path.join(checkpoint_dir, sorted(checkpoint_files)[-1])
-        print(f"Found checkpoint: {latest_checkpoint}")
-        taxon_data = pd.read_csv(latest_checkpoint)
-    
+    log.info("Loading taxon data from %s", input_file)
+    taxon_data = pd.read_csv(input_file).convert_dtypes(dtype_backend='pyarrow')
+
+    # Initialize new columns as nullable Arrow-backed integers upfront, so
+    # isna checks are bitmap scans and per-batch merges replace whole
+    # buffers instead of thrashing through object dtype
+    for col in ('attention_ss', 'attention_pm', 'year_ofd'):
+        if col not in taxon_data.columns:
+            taxon_data[col] = pd.array([pd.NA] * len(taxon_data), dtype='int64[pyarrow]')
+        else:
+            taxon_data[col] = taxon_data[col].astype('int64[pyarrow]')
+
+    # Replay the delta log from any earlier run: each line holds the fetched
+    # values for one completed taxon, so recovery is a read of just the work
+    # already done rather than a full-DataFrame checkpoint
+    delta_path = os.path.join(checkpoint_dir, 'delta.ndjson')
+    if os.path.exists(delta_path):
+        log.info("Replaying delta log %s", delta_path)
+        prev = {'attention_ss': {}, 'attention_pm': {}, 'year_ofd': {}}
+        with open(delta_path, 'rb') as f:
+            for line in f:
+                record = orjson.loads(line)
+                for col in prev:
+                    if record.get(col) is not None:
+                        prev[col][record['taxon_name']] = record[col]
+        for col, values in prev.items():
+            taxon_data[col] = taxon_data[col].fillna(taxon_data['taxon_name'].map(values)).astype('int64[pyarrow]')
+
     total_rows = len(taxon_data)
-    print(f"Processing {total_rows} taxa")
-    
-    # Process each taxon
-    start_idx = 0
-    for idx in range(total_rows):
-        # Skip already processed rows
-        if not pd.isna(taxon_data.at[idx, 'attention_ss']) and not pd.isna(taxon_data.at[idx, 'attention_pm']) and not pd.isna(taxon_data.at[idx, 'year_ofd']):
-            start_idx = idx + 1
-            continue
-        
-        taxon_name = taxon_data.at[idx, 'taxon_name']
-        print(f"Processing {idx+1}/{total_rows}: {taxon_name}")
-        
-        # Get attention from Semantic Scholar
-        if pd.isna(taxon_data.at[idx, 'attention_ss']):
-            attention_ss = get_semantic_scholar_attention(taxon_name)
-            taxon_data.at[idx, 'attention_ss'] = attention_ss
-            print(f"  Semantic Scholar attention: {attention_ss}")
-            time.sleep(0.5)  # Brief pause between API calls
-        
-        # Get attention from PubMed
-        if pd.isna(taxon_data.at[idx, 'attention_pm']):
-            attention_pm = get_pubmed_attention(taxon_name)
-            taxon_data.at[idx, 'attention_pm'] = attention_pm
-            print(f"  PubMed attention: {attention_pm}")
-            time.sleep(0.5)  # Brief pause between API calls
-        
-        # Get year of first description from Wikidata
-        if pd.isna(taxon_data.at[idx, 'year_ofd']):
-            year = get_wikidata_year(taxon_name)
-            taxon_data.at[idx, 'year_ofd'] = year
-            print(f"  Year of first description: {year}")
-        
-        # Create checkpoint after processing batch_size records
-        if (idx + 1) % batch_size == 0 or idx == total_rows - 1:
-            checkpoint_file = os.path.join(checkpoint_dir, f"checkpoint_{idx+1}.csv")
-            taxon_data.to_csv(checkpoint_file, index=False)
-            print(f"Saved checkpoint to {checkpoint_file}")
-        
-        # Be gentle with the APIs - pause between taxon processing
-        time.sleep(1)
-    
+    log.info("Processing %d taxa", total_rows)
+
+    # Work out which unique names still need each field, so every name is
+    # fetched at most once even if it appears in multiple rows
+    needs_ss = set(taxon_data.loc[taxon_data['attention_ss'].isna(), 'taxon_name'].unique())
+    needs_pm = set(taxon_data.loc[taxon_data['attention_pm'].isna(), 'taxon_name'].unique())
+    needs_wd = set(taxon_data.loc[taxon_data['year_ofd'].isna(), 'taxon_name'].unique())
+    pending_names = sorted(needs_ss | needs_pm | needs_wd)
+    log.info("%d unique taxa still need enrichment", len(pending_names))
+
+    ss_semaphore = asyncio.Semaphore(SS_CONCURRENCY)
+    pm_semaphore = asyncio.Semaphore(PM_CONCURRENCY)
+    wd_semaphore = asyncio.Semaphore(WD_CONCURRENCY)
+
+    os.makedirs(os.path.join(output_dir, 'cache'), exist_ok=True)
+    neg_cache = NegativeCache(os.path.join(output_dir, 'cache', 'neg_cache.sqlite'))
+    if refresh_negatives:
+        log.info("Clearing negative cache")
+        neg_cache.clear()
+
+    connector = aiohttp.TCPConnector(limit_per_host=8, keepalive_timeout=KEEPALIVE_TIMEOUT)
+    session_headers = {"User-Agent": USER_AGENT}
+    if use_cache:
+        cache = SQLiteBackend(
+            cache_name=os.path.join(output_dir, 'cache', 'taxon_api'),
+            expire_after=CACHE_EXPIRE_AFTER,
+            allowed_codes=(200,),
+        )
+        session_cm = CachedSession(cache=cache, connector=connector, headers=session_headers)
+    else:
+        session_cm = aiohttp.ClientSession(connector=connector, headers=session_headers)
+
+    # Results accumulate per unique name and are merged into the DataFrame
+    # in one vectorized pass per batch
+    ss_results = {}
+    pm_results = {}
+    wd_results = {}
+
+    # The delta log is line-buffered so every completed taxon is durable as
+    # soon as its record is written
+    delta_log = open(delta_path, 'a', buffering=1)
+
+    async with session_cm as session:
+
+        def merge_results():
+            taxon_data['attention_ss'] = taxon_data['attention_ss'].fillna(taxon_data['taxon_name'].map(ss_results)).astype('int64[pyarrow]')
+            taxon_data['attention_pm'] = taxon_data['attention_pm'].fillna(taxon_data['taxon_name'].map(pm_results)).astype('int64[pyarrow]')
+            taxon_data['year_ofd'] = taxon_data['year_ofd'].fillna(taxon_data['taxon_name'].map(wd_results)).astype('int64[pyarrow]')
+
+        # Process in batches; each API gets one batch call per chunk
+        # instead of one call per row
+        for batch_start in range(0, len(pending_names), batch_size):
+            batch = pending_names[batch_start:batch_start + batch_size]
+            log.info("Processing %d-%d/%d", batch_start + 1, batch_start + len(batch), len(pending_names))
+
+            # Taxa the negative cache knows to be empty resolve immediately;
+            # only the rest go out over the network
+            batch_ss = [n for n in batch if n in needs_ss and not neg_cache.known_empty('ss', n)]
+            batch_pm = [n for n in batch if n in needs_pm and not neg_cache.known_empty('pm', n)]
+            batch_wd = [n for n in batch if n in needs_wd and not neg_cache.known_empty('wd', n)]
+            ss_results.update({n: 0 for n in batch if n in needs_ss and n not in batch_ss})
+            pm_results.update({n: 0 for n in batch if n in needs_pm and n not in batch_pm})
+            wd_results.update({n: None for n in batch if n in needs_wd and n not in batch_wd})
+
+            new_ss, new_pm, new_wd = await asyncio.gather(
+                ss_batch(session, ss_semaphore, batch_ss),
+                pm_batch(session, pm_semaphore, batch_pm),
+                wd_batch(session, wd_semaphore, batch_wd),
+            )
+
+            # Remember confirmed misses so the next run can skip them.
+            # Failed fetches come back as None and are left out - they stay
+            # NA in the DataFrame and get retried on the next run
+            neg_cache.record_empty('ss', [n for n, v in new_ss.items() if v == 0])
+            neg_cache.record_empty('pm', [n for n, v in new_pm.items() if v == 0])
+            neg_cache.record_empty('wd', [n for n, v in new_wd.items() if v is NO_RESULT])
+
+            ss_results.update(new_ss)
+            pm_results.update(new_pm)
+            wd_results.update({n: (None if v is NO_RESULT else v) for n, v in new_wd.items()})
+
+            merge_results()
+
+            # Append one delta record per taxon completed in this batch -
+            # O(total names) checkpoint bytes across the whole run instead
+            # of rewriting the full DataFrame every batch
+            for name in batch:
+                delta_log.write(orjson.dumps({
+                    'taxon_name': name,
+                    'attention_ss': ss_results.get(name),
+                    'attention_pm': pm_results.get(name),
+                    'year_ofd': wd_results.get(name),
+                }).decode() + "\n")
+            log.info("Appended %d records to %s", len(batch), delta_path)
+
+    delta_log.close()
+
     # Save final result
     taxon_data.to_csv(output_file, index=False)
-    print(f"Enrichment complete. Results saved to {output_file}")
+    log.info("Enrichment complete. Results saved to %s", output_file)
 
 def main():
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Enrich taxon data with attention counts and first-description years")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the on-disk HTTP cache and force fresh API requests")
+    parser.add_argument('--refresh-negatives', action='store_true', help="Clear the negative cache and re-query taxa that previously had no results")
+    args = parser.parse_args()
+
     # Configuration
     input_file = '/app/data/final_01_degree.csv'
     output_file = '/app/exports/final_01_attention.csv'
-    batch_size = 50  # Create checkpoint after processing this many records
-    
+    batch_size = 50  # Number of taxa fetched concurrently per batch
+
     # Process
-    enrich_taxon_data(input_file, output_file, batch_size)
+    asyncio.run(enrich_taxon_data(
+        input_file, output_file, batch_size,
+        use_cache=not args.no_cache,
+        refresh_negatives=args.refresh_negatives,
+    ))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
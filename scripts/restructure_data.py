@@ -1,10 +1,20 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.dataset as ds
 
-globi = pd.read_csv('../data/interactions.csv')
+# Stream the interactions CSV through Arrow instead of loading it into a
+# pandas DataFrame: only the two name columns are ever materialized, and
+# the degree count runs in Arrow's native hash aggregate.
+# Unlike pandas, Arrow reads empty CSV fields as "" unless told otherwise
+csv_format = ds.CsvFileFormat(convert_options=pa.csv.ConvertOptions(strings_can_be_null=True))
+globi = ds.dataset('../data/interactions.csv', format=csv_format)
 
+source = globi.to_table(columns=['source_taxon_name']).rename_columns(['taxon_name'])
+target = globi.to_table(columns=['target_taxon_name']).rename_columns(['taxon_name'])
+species = pa.concat_tables([source, target])
 
-species = pd.concat([pd.DataFrame({'taxon_name': globi['source_taxon_name']}), pd.DataFrame({'taxon_name': globi['target_taxon_name']})], ignore_index=True)['taxon_name']
-restructured = pd.DataFrame({'taxon_name': species})
-restructured = restructured.value_counts().reset_index()
-restructured.columns = ['taxon_name', 'degree']
-restructured.to_csv('../exports/final_01_degree.csv', index=False)
\ No newline at end of file
+# Arrow's value_counts counts nulls too; drop them so missing names don't
+# produce an empty-name row (pandas value_counts skipped them)
+counts = species['taxon_name'].drop_null().value_counts()
+restructured = pa.table({'taxon_name': counts.field('values'), 'degree': counts.field('counts')})
+pa.csv.write_csv(restructured, '../exports/final_01_degree.csv')
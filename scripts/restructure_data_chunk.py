@@ -1,111 +1,104 @@
 import pandas as pd
 import os
-import gc
+from collections import Counter
 
-def split_large_csv(input_file, temp_dir, chunk_size=1000000):
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+def process_lazy(input_file, output_file):
     """
-    Split a large CSV file into smaller temporary chunks for processing.
-    
+    Stream the interactions file once with polars and write the degree counts.
+
+    The lazy scan never materializes the full file: both name columns are
+    unioned and group-by-counted in a single streaming pass, so memory stays
+    bounded by the number of unique taxon names instead of the row count.
+
     Args:
         input_file: Path to the input CSV file
-        temp_dir: Directory to save temporary chunk files
-        chunk_size: Number of rows per chunk
+        output_file: Path to save the final output
     """
-    # Create temp directory if it doesn't exist
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
-    
-    # Get the base filename without extension
-    base_name = os.path.basename(input_file).split('.')[0]
-    
-    print(f"Splitting {input_file} into chunks of {chunk_size} rows...")
-    
-    # Read and write in chunks
-    chunk_paths = []
-    for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunk_size)):
-        chunk_path = os.path.join(temp_dir, f"{base_name}_chunk_{i}.csv")
-        chunk.to_csv(chunk_path, index=False)
-        chunk_paths.append(chunk_path)
-        print(f"Created chunk {i+1}: {chunk_path}")
-        
-        # Free memory
-        del chunk
-        gc.collect()
-    
-    return chunk_paths
-
-def process_chunks(chunk_paths, output_file):
+    print(f"Streaming {input_file} with polars...")
+
+    output_dir = os.path.dirname(output_file)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    source = pl.scan_csv(input_file).select(pl.col('sourceTaxonName').alias('taxon_name'))
+    target = pl.scan_csv(input_file).select(pl.col('targetTaxonName').alias('taxon_name'))
+
+    (
+        pl.concat([source, target])
+        .drop_nulls()
+        .group_by('taxon_name')
+        .len()
+        .rename({'len': 'degree'})
+        .sink_csv(output_file)
+    )
+    print(f"Results saved to {output_file}")
+
+def process_stream(input_file, output_file, chunk_size=1000000):
     """
-    Process each chunk to create a consolidated degree count.
-    
+    Stream the interactions file in pandas chunks and write the degree counts.
+
+    Chunks are fed straight from read_csv into a Counter, so the file is read
+    exactly once with no temp files in between, and each chunk is freed as
+    soon as the next one is read.
+
     Args:
-        chunk_paths: List of paths to chunk files
+        input_file: Path to the input CSV file
         output_file: Path to save the final output
+        chunk_size: Number of rows per chunk
     """
-    print("Processing chunks and counting species occurrences...")
-    
-    # Initialize empty DataFrame for all species
-    all_species = pd.DataFrame(columns=['taxon_name'])
-    
-    # Process each chunk
-    for i, chunk_path in enumerate(chunk_paths):
-        print(f"Processing chunk {i+1}/{len(chunk_paths)}")
-        
-        # Read chunk
-        chunk = pd.read_csv(chunk_path)
-        
-        # Extract species from source and target columns and combine
-        species = pd.concat([
-            pd.DataFrame({'taxon_name': chunk['sourceTaxonName']}),
-            pd.DataFrame({'taxon_name': chunk['targetTaxonName']})
-        ], ignore_index=True)
-        
-        # Append to all_species
-        all_species = pd.concat([all_species, species], ignore_index=True)
-        
-        # Free memory
-        del chunk
-        del species
-        gc.collect()
-    
+    print(f"Streaming {input_file} in chunks of {chunk_size} rows...")
+
+    # Count within each chunk and merge the counts, so memory is bounded by
+    # the number of unique names rather than the total row count
+    counter = Counter()
+
+    reader = pd.read_csv(
+        input_file,
+        usecols=['sourceTaxonName', 'targetTaxonName'],
+        dtype='string[pyarrow]',
+        chunksize=chunk_size,
+    )
+    for i, chunk in enumerate(reader):
+        print(f"Processing chunk {i+1}")
+
+        # Count species from source and target columns
+        counter.update(chunk['sourceTaxonName'].dropna())
+        counter.update(chunk['targetTaxonName'].dropna())
+
     print("Counting occurrences...")
-    
-    # Count occurrences (value_counts) exactly as in your original code
-    restructured = all_species.value_counts().reset_index()
-    restructured.columns = ['taxon_name', 'degree']
-    
+
+    # Assemble the merged counts without sorting - nothing downstream
+    # depends on row order, and sorting millions of unique names costs an
+    # avoidable O(U log U)
+    restructured = pd.DataFrame(counter.items(), columns=['taxon_name', 'degree'])
+
     # Save result
     output_dir = os.path.dirname(output_file)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
+
     restructured.to_csv(output_file, index=False)
     print(f"Results saved to {output_file}")
-    
-    return restructured
 
-def cleanup_temp_files(chunk_paths):
-    """Remove temporary chunk files."""
-    print("Cleaning up temporary files...")
-    for path in chunk_paths:
-        if os.path.exists(path):
-            os.remove(path)
-    print("Cleanup complete.")
+    return restructured
 
 def main():
     # Configuration
     input_file = '/app/data/interactions.csv'  # Your 30GB file
-    temp_dir = '/app/temp/'
     output_file = '/app/exports/final_01_degree.csv'
-    chunk_size = 5000  # Adjust based on available memory
-    
-    # Process
-    # chunk_paths = split_large_csv(input_file, temp_dir, chunk_size)
-    chunk_paths = []
-    for i in os.listdir('/app/temp/'):
-        chunk_paths.append(f'/app/temp/{i}') 
-    process_chunks(chunk_paths, output_file)
-    cleanup_temp_files(chunk_paths)
+    chunk_size = 1000000  # Adjust based on available memory
+
+    # Process - polars streams the whole aggregation natively; otherwise
+    # stream pandas chunks directly into the counter
+    if pl is not None:
+        process_lazy(input_file, output_file)
+    else:
+        process_stream(input_file, output_file, chunk_size)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
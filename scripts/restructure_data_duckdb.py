@@ -0,0 +1,47 @@
+import duckdb
+import os
+
+def restructure(input_file, output_file, source_col='source_taxon_name', target_col='target_taxon_name'):
+    """
+    Count taxon degrees straight from the interactions CSV with DuckDB.
+
+    One SQL statement replaces both pandas restructure pipelines: DuckDB
+    scans the CSV with all cores, streams the union of the two name columns
+    through its hash aggregate, and copies the result out — no intermediate
+    DataFrames in Python memory.
+
+    Args:
+        input_file: Path to the input CSV file
+        output_file: Path to save the final output
+        source_col: Name of the source taxon column in the input schema
+        target_col: Name of the target taxon column in the input schema
+    """
+    output_dir = os.path.dirname(output_file)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    print(f"Counting degrees in {input_file} with DuckDB...")
+    duckdb.sql(f"""
+        COPY (
+            SELECT taxon_name, COUNT(*) AS degree FROM (
+                SELECT {source_col} AS taxon_name FROM read_csv_auto('{input_file}')
+                UNION ALL
+                SELECT {target_col} FROM read_csv_auto('{input_file}')
+            )
+            WHERE taxon_name IS NOT NULL
+            GROUP BY taxon_name
+            ORDER BY degree DESC
+        ) TO '{output_file}' (HEADER, DELIMITER ',')
+    """)
+    print(f"Results saved to {output_file}")
+
+def main():
+    # Configuration - the 30GB interactions dump uses camelCase columns
+    input_file = '/app/data/interactions.csv'
+    output_file = '/app/exports/final_01_degree.csv'
+
+    # Process
+    restructure(input_file, output_file, source_col='sourceTaxonName', target_col='targetTaxonName')
+
+if __name__ == "__main__":
+    main()